@@ -1,14 +1,17 @@
 import streamlit as st
 import os
-import pandas as pd
-import zipfile
-import io
+import csv
 import random
-from PIL import Image
-import uuid
+import shutil
+import tempfile
 from datetime import datetime
+from typing import TYPE_CHECKING
 from voice_recognition import create_voice_input_component, install_speech_dependencies
 
+# pandas, PIL and zipfile are imported where they are used to keep cold start fast
+if TYPE_CHECKING:
+    import pandas as pd
+
 # Indian languages with their codes
 INDIAN_LANGUAGES = {
     "English": "en",
@@ -35,26 +38,121 @@ INDIAN_LANGUAGES = {
     "Santali": "sat",
     "Sindhi": "sd"
 }
-
+INDIAN_LANGUAGE_NAMES = tuple(INDIAN_LANGUAGES.keys())
+
+# Fixed column order for the metadata CSVs (rows are appended, never rewritten)
+VOICE_COLUMNS = [
+    "input_method",
+    "audio_file",
+    "voice_audio_duration",
+    "voice_language_code",
+    "voice_confidence",
+    "voice_provider"
+]
+METADATA_COLUMNS = [
+    "filename",
+    "original_name",
+    "caption",
+    "language",
+    "language_code",
+    "timestamp",
+    "file_size"
+] + VOICE_COLUMNS
+CAPTIONED_COLUMNS = [
+    "filename",
+    "caption",
+    "language",
+    "language_code",
+    "timestamp",
+    "status"
+] + VOICE_COLUMNS
+
+PREVIEW_SIZE = (800, 800)
+THUMBNAIL_SIZE = (512, 512)
+THUMBNAIL_DIR = "thumbnails"
+
+CATEGORICAL_COLUMNS = ["language", "language_code", "input_method"]
+
+IMAGE_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg', '.gif', '.bmp'})
+
+METADATA_FILE = "metadata/image_metadata.csv"
+CAPTIONED_METADATA_FILE = "metadata/captioned_metadata.csv"
+
+def is_image_file(filename):
+    """Check a filename's extension against IMAGE_EXTENSIONS"""
+    return os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS
+
+@st.cache_resource(show_spinner=False)
 def initialize_directories():
-    """Create necessary directories if they don't exist"""
-    directories = ["uploaded_images", "captioned_images", "metadata"]
+    """Create necessary directories, migrate legacy metadata and prune stale thumbnails; runs once per process"""
+    directories = ["uploaded_images", "captioned_images", "metadata", THUMBNAIL_DIR]
     for directory in directories:
-        if not os.path.exists(directory):
-            os.makedirs(directory)
+        os.makedirs(directory, exist_ok=True)
+    migrate_metadata_files()
+    prune_thumbnails()
+
+def prune_thumbnails():
+    """Delete thumbnails whose uploaded image no longer exists"""
+    uploaded = set(os.listdir("uploaded_images"))
+    with os.scandir(THUMBNAIL_DIR) as entries:
+        for entry in entries:
+            # Thumbnails are named "<uploaded filename>.jpg"
+            if entry.name.endswith(".jpg") and entry.name[:-len(".jpg")] not in uploaded:
+                os.remove(entry.path)
+
+def migrate_metadata_files():
+    """Rewrite legacy metadata CSVs once so their header matches the fixed column order"""
+    for metadata_file, columns in ((METADATA_FILE, METADATA_COLUMNS), (CAPTIONED_METADATA_FILE, CAPTIONED_COLUMNS)):
+        try:
+            with open(metadata_file, newline="", encoding="utf-8") as f:
+                header = next(csv.reader(f), [])
+        except FileNotFoundError:
+            continue
+        if header == columns:
+            continue
+        import pandas as pd
+
+        # Ensure only one caption column and include the audio/voice columns
+        df = pd.read_csv(metadata_file)
+        df = df.drop(columns=["final_caption"], errors="ignore")
+        df = df.reindex(columns=columns)
+        df.to_csv(metadata_file, index=False)
+
+def append_metadata_row(metadata_file, columns, metadata):
+    """Append a single metadata row, writing the header if the file is new"""
+    # Always append: opening with "w" could truncate a row another session just wrote
+    with open(metadata_file, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore", lineterminator="\n")
+        if f.tell() == 0:
+            writer.writeheader()
+        writer.writerow(metadata)
+
+def write_buffer(path, buffer):
+    """Write a bytes-like buffer straight to a file descriptor, without Python file buffering"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        view = memoryview(buffer)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
 
 def save_image_and_metadata(uploaded_file, caption, language, metadata_extras=None):
     """Save uploaded image and its metadata. Optionally include extra metadata fields."""
-    initialize_directories()
-
     # Generate unique filename
-    file_extension = uploaded_file.name.split('.')[-1]
-    unique_filename = f"{uuid.uuid4()}.{file_extension}"
+    _, file_extension = os.path.splitext(uploaded_file.name)
+    unique_filename = f"{os.urandom(8).hex()}{file_extension.lower()}"
 
     # Save image
     image_path = os.path.join("uploaded_images", unique_filename)
-    with open(image_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
+    with uploaded_file.getbuffer() as buffer:
+        write_buffer(image_path, buffer)
+
+    # Pre-generate the display thumbnail; it is optional, so a failure doesn't block the save
+    try:
+        ensure_thumbnail(unique_filename)
+    except OSError:
+        pass
 
     # Save metadata
     metadata = {
@@ -71,30 +169,77 @@ def save_image_and_metadata(uploaded_file, caption, language, metadata_extras=No
     if metadata_extras:
         metadata.update(metadata_extras)
 
-    # Load existing metadata or create new
-    metadata_file = "metadata/image_metadata.csv"
-    if os.path.exists(metadata_file):
-        df = pd.read_csv(metadata_file)
-        df = pd.concat([df, pd.DataFrame([metadata])], ignore_index=True)
-    else:
-        df = pd.DataFrame([metadata])
-    # Ensure only one caption column and include audio_file column
-    df = df.drop(columns=["final_caption"], errors="ignore")
-    if "audio_file" not in df.columns:
-        df["audio_file"] = None
-
-    df.to_csv(metadata_file, index=False)
+    # Append to existing metadata or create new
+    append_metadata_row(METADATA_FILE, METADATA_COLUMNS, metadata)
 
     return unique_filename
 
-def get_random_image():
-    """Get a random image from uploaded_images folder"""
-    initialize_directories()
-
-    if not os.path.exists("uploaded_images"):
+@st.cache_data(show_spinner=False)
+def _load_metadata(path: str, mtime: float) -> "pd.DataFrame":
+    """Read a metadata CSV; cached until the file's mtime changes"""
+    import pandas as pd
+
+    df = pd.read_csv(path, engine="pyarrow", dtype_backend="pyarrow")
+    # Low-cardinality columns are stored as categories
+    columns = [c for c in CATEGORICAL_COLUMNS if c in df.columns]
+    df[columns] = df[columns].astype("string").astype("category")
+    return df
+
+def load_metadata(path):
+    """Load a metadata CSV through the cache, or None if it doesn't exist"""
+    try:
+        mtime = os.path.getmtime(path)
+    except FileNotFoundError:
         return None
+    return _load_metadata(path, mtime)
+
+def load_all_metadata():
+    """Return (uploaded_df, captioned_df); either may be None if missing"""
+    return load_metadata(METADATA_FILE), load_metadata(CAPTIONED_METADATA_FILE)
+
+@st.cache_data(show_spinner=False)
+def _list_images(dirpath: str, mtime: float) -> list[str]:
+    """List image filenames in a directory; cached until the directory's mtime changes"""
+    with os.scandir(dirpath) as entries:
+        return [entry.name for entry in entries if is_image_file(entry.name) and entry.is_file()]
+
+def list_images(dirpath):
+    """List image filenames in a directory through the cache, or [] if it doesn't exist"""
+    try:
+        mtime = os.path.getmtime(dirpath)
+    except FileNotFoundError:
+        return []
+    return _list_images(dirpath, mtime)
+
+@st.cache_data(show_spinner=False)
+def _count_images(dirpath: str, mtime: float) -> int:
+    """Count image files in a directory; cached as a plain int so a hit doesn't unpickle the listing"""
+    return len(_list_images(dirpath, mtime))
+
+def count_images(dirpath):
+    """Count image files in a directory through the cache, or 0 if it doesn't exist"""
+    try:
+        mtime = os.path.getmtime(dirpath)
+    except FileNotFoundError:
+        return 0
+    return _count_images(dirpath, mtime)
+
+def count_dataset_images():
+    """Return (uploaded_count, captioned_count) from the cached image counts"""
+    return count_images("uploaded_images"), count_images("captioned_images")
+
+def count_unique_languages(*frames):
+    """Count distinct languages across the given metadata frames, skipping missing ones"""
+    import pandas as pd
+
+    languages = [df['language'] for df in frames if df is not None]
+    if not languages:
+        return 0
+    return pd.concat(languages, ignore_index=True).nunique()
 
-    images = [f for f in os.listdir("uploaded_images") if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp'))]
+def get_random_image():
+    """Get a random image from uploaded_images folder"""
+    images = list_images("uploaded_images")
 
     if not images:
         return None
@@ -103,75 +248,116 @@ def get_random_image():
 
 def save_captioned_image(filename, caption, language, metadata_extras=None):
     """Save image with new caption to captioned_images folder. Optionally include extra metadata."""
-    initialize_directories()
-
     # Copy image to captioned folder
     src_path = os.path.join("uploaded_images", filename)
     dst_path = os.path.join("captioned_images", filename)
 
-    if os.path.exists(src_path):
-        # Copy the file
-        with open(src_path, "rb") as src_file:
-            with open(dst_path, "wb") as dst_file:
-                dst_file.write(src_file.read())
-
-        # Update metadata
-        metadata = {
-            "filename": filename,
-            "caption": caption,
-            "language": language,
-            "language_code": INDIAN_LANGUAGES[language],
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "status": "captioned",
-            "input_method": "Text",
-            "audio_file": None
-        }
-        if metadata_extras:
-            metadata.update(metadata_extras)
-
-        # Save captioned metadata
-        captioned_metadata_file = "metadata/captioned_metadata.csv"
-        if os.path.exists(captioned_metadata_file):
-            df = pd.read_csv(captioned_metadata_file)
-            df = pd.concat([df, pd.DataFrame([metadata])], ignore_index=True)
-        else:
-            df = pd.DataFrame([metadata])
-        # Ensure only one caption column and include audio_file column
-        df = df.drop(columns=["final_caption"], errors="ignore")
-        if "audio_file" not in df.columns:
-            df["audio_file"] = None
-
-        df.to_csv(captioned_metadata_file, index=False)
+    # Hard-link the file (no bytes copied); fall back to a copy where links aren't possible
+    try:
+        os.link(src_path, dst_path)
+    except FileNotFoundError:
+        return False
+    except FileExistsError:
+        # Already captioned before; the image is in place
+        pass
+    except OSError:
+        shutil.copyfile(src_path, dst_path)
+
+    # Update metadata
+    metadata = {
+        "filename": filename,
+        "caption": caption,
+        "language": language,
+        "language_code": INDIAN_LANGUAGES[language],
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "status": "captioned",
+        "input_method": "Text",
+        "audio_file": None
+    }
+    if metadata_extras:
+        metadata.update(metadata_extras)
 
-        return True
-    return False
+    # Save captioned metadata
+    append_metadata_row(CAPTIONED_METADATA_FILE, CAPTIONED_COLUMNS, metadata)
+
+    return True
+
+def open_preview(source, size=PREVIEW_SIZE):
+    """Open an image downscaled to fit size for display"""
+    from PIL import Image
+
+    image = Image.open(source)
+    # JPEGs are scaled during decode; other formats are resized after loading
+    image.draft('RGB', size)
+    image.thumbnail(size, Image.Resampling.BILINEAR)
+    return image
+
+def ensure_thumbnail(filename):
+    """Return the path of an uploaded image's JPEG thumbnail, creating it on first use"""
+    thumbnail_path = os.path.join(THUMBNAIL_DIR, f"{filename}.jpg")
+    # The only check on a rerun: an existing thumbnail is returned without opening anything
+    if os.path.exists(thumbnail_path):
+        return thumbnail_path
+
+    image = open_preview(os.path.join("uploaded_images", filename), THUMBNAIL_SIZE)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    image.save(thumbnail_path, format="JPEG", quality=85, optimize=True)
+    return thumbnail_path
+
+def add_to_zip(zip_file, file_path, arcname):
+    """Add a file to the archive, storing images as-is and deflating everything else"""
+    import zipfile
+
+    if is_image_file(arcname):
+        # Images are already compressed; deflating them again only costs CPU
+        zip_file.write(file_path, arcname, compress_type=zipfile.ZIP_STORED)
+    else:
+        zip_file.write(file_path, arcname, compress_type=zipfile.ZIP_DEFLATED, compresslevel=1)
 
 def create_dataset_zip():
-    """Create a zip file containing all images and metadata"""
-    zip_buffer = io.BytesIO()
-
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        # Add uploaded images
-        if os.path.exists("uploaded_images"):
-            for filename in os.listdir("uploaded_images"):
-                file_path = os.path.join("uploaded_images", filename)
-                zip_file.write(file_path, f"uploaded_images/{filename}")
-
-        # Add captioned images
-        if os.path.exists("captioned_images"):
-            for filename in os.listdir("captioned_images"):
-                file_path = os.path.join("captioned_images", filename)
-                zip_file.write(file_path, f"captioned_images/{filename}")
-
-        # Add metadata files
-        if os.path.exists("metadata"):
-            for filename in os.listdir("metadata"):
+    """Create a zip file on disk containing all images and metadata. Returns its path."""
+    import zipfile
+
+    zip_fd, zip_path = tempfile.mkstemp(suffix=".zip")
+    os.close(zip_fd)
+
+    try:
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED) as zip_file:
+            # Add uploaded and captioned images
+            for directory in ("uploaded_images", "captioned_images"):
+                try:
+                    filenames = os.listdir(directory)
+                except FileNotFoundError:
+                    continue
+                for filename in filenames:
+                    file_path = os.path.join(directory, filename)
+                    add_to_zip(zip_file, file_path, f"{directory}/{filename}")
+
+            # Add metadata files
+            try:
+                metadata_filenames = os.listdir("metadata")
+            except FileNotFoundError:
+                metadata_filenames = []
+            for filename in metadata_filenames:
                 if filename.endswith('.csv'):
                     file_path = os.path.join("metadata", filename)
-                    zip_file.write(file_path, f"metadata/{filename}")
-
-    zip_buffer.seek(0)
-    return zip_buffer.getvalue()
+                    add_to_zip(zip_file, file_path, f"metadata/{filename}")
+    except Exception:
+        # Don't leave a partial archive behind in the temp directory
+        os.remove(zip_path)
+        raise
+
+    return zip_path
+
+def read_dataset_zip():
+    """Build the dataset zip and return its bytes, removing the temp file afterwards"""
+    zip_path = create_dataset_zip()
+    try:
+        with open(zip_path, "rb") as zip_file:
+            return zip_file.read()
+    finally:
+        os.remove(zip_path)
 
 def main():
     st.set_page_config(
@@ -215,7 +401,7 @@ def main():
 
             if uploaded_file is not None:
                 # Display uploaded image
-                image = Image.open(uploaded_file)
+                image = open_preview(uploaded_file)
                 st.image(image, caption="Uploaded Image", use_column_width=True)
 
         with col2:
@@ -223,7 +409,7 @@ def main():
                 # Language selection
                 selected_language = st.selectbox(
                     "Select Language for Caption",
-                    options=list(INDIAN_LANGUAGES.keys()),
+                    options=INDIAN_LANGUAGE_NAMES,
                     index=0,
                     help="Choose the language for your image caption"
                 )
@@ -291,7 +477,7 @@ def main():
             if "random_image" in st.session_state:
                 image_path = os.path.join("uploaded_images", st.session_state.random_image)
                 if os.path.exists(image_path):
-                    image = Image.open(image_path)
+                    image = ensure_thumbnail(st.session_state.random_image)
                     st.image(image, caption=f"Random Image: {st.session_state.random_image}", use_column_width=True)
 
         with col2:
@@ -299,7 +485,7 @@ def main():
                 # Language selection for captioning
                 selected_language = st.selectbox(
                     "Select Language for New Caption",
-                    options=list(INDIAN_LANGUAGES.keys()),
+                    options=INDIAN_LANGUAGE_NAMES,
                     index=0,
                     key="caption_language"
                 )
@@ -365,8 +551,7 @@ def main():
         # Show statistics
         col1, col2, col3, col4 = st.columns(4)
 
-        uploaded_count = len([f for f in os.listdir("uploaded_images") if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp'))]) if os.path.exists("uploaded_images") else 0
-        captioned_count = len([f for f in os.listdir("captioned_images") if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp'))]) if os.path.exists("captioned_images") else 0
+        uploaded_count, captioned_count = count_dataset_images()
 
         with col1:
             st.metric("📤 Uploaded Images", uploaded_count)
@@ -377,16 +562,11 @@ def main():
         with col3:
             st.metric("📊 Total Images", uploaded_count + captioned_count)
 
+        uploaded_df, captioned_df = load_all_metadata()
+
         with col4:
             # Count unique languages
-            unique_languages = set()
-            if os.path.exists("metadata/image_metadata.csv"):
-                df = pd.read_csv("metadata/image_metadata.csv")
-                unique_languages.update(df['language'].unique())
-            if os.path.exists("metadata/captioned_metadata.csv"):
-                df = pd.read_csv("metadata/captioned_metadata.csv")
-                unique_languages.update(df['language'].unique())
-            st.metric("🌐 Languages", len(unique_languages))
+            st.metric("🌐 Languages", count_unique_languages(uploaded_df, captioned_df))
 
         # Show metadata tables
         st.subheader("📊 Dataset Metadata")
@@ -394,16 +574,14 @@ def main():
         tab1, tab2 = st.tabs(["Uploaded Images", "Captioned Images"])
 
         with tab1:
-            if os.path.exists("metadata/image_metadata.csv"):
-                df = pd.read_csv("metadata/image_metadata.csv")
-                st.dataframe(df, use_container_width=True)
+            if uploaded_df is not None:
+                st.dataframe(uploaded_df, use_container_width=True)
             else:
                 st.info("No uploaded images metadata found.")
 
         with tab2:
-            if os.path.exists("metadata/captioned_metadata.csv"):
-                df = pd.read_csv("metadata/captioned_metadata.csv")
-                st.dataframe(df, use_container_width=True)
+            if captioned_df is not None:
+                st.dataframe(captioned_df, use_container_width=True)
             else:
                 st.info("No captioned images metadata found.")
 
@@ -418,8 +596,7 @@ def main():
         """)
 
         # Show dataset summary
-        uploaded_count = len([f for f in os.listdir("uploaded_images") if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp'))]) if os.path.exists("uploaded_images") else 0
-        captioned_count = len([f for f in os.listdir("captioned_images") if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp'))]) if os.path.exists("captioned_images") else 0
+        uploaded_count, captioned_count = count_dataset_images()
 
         if uploaded_count > 0 or captioned_count > 0:
             col1, col2 = st.columns([1, 1])
@@ -428,12 +605,10 @@ def main():
                 st.info(f"📊 **Dataset Summary:**\n- {uploaded_count} uploaded images\n- {captioned_count} captioned images\n- {uploaded_count + captioned_count} total images")
 
             with col2:
-                # Create download button
-                zip_data = create_dataset_zip()
-
+                # Create download button; the archive is only built when clicked
                 st.download_button(
                     label="📥 Download Complete Dataset (ZIP)",
-                    data=zip_data,
+                    data=read_dataset_zip,
                     file_name=f"image_dataset_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
                     mime="application/zip",
                     type="primary"
@@ -13,17 +13,20 @@ def load_dataset():
     metadata_files = []
 
     if os.path.exists("metadata/image_metadata.csv"):
-        df1 = pd.read_csv("metadata/image_metadata.csv")
+        df1 = pd.read_csv("metadata/image_metadata.csv", engine="pyarrow", dtype_backend="pyarrow")
         df1['source'] = 'uploaded'
         metadata_files.append(df1)
 
     if os.path.exists("metadata/captioned_metadata.csv"):
-        df2 = pd.read_csv("metadata/captioned_metadata.csv") 
+        df2 = pd.read_csv("metadata/captioned_metadata.csv", engine="pyarrow", dtype_backend="pyarrow")
         df2['source'] = 'captioned'
         metadata_files.append(df2)
 
     if metadata_files:
         complete_metadata = pd.concat(metadata_files, ignore_index=True)
+        # Few distinct values per column, so store them as categories
+        columns = [c for c in ['language', 'language_code', 'source', 'input_method'] if c in complete_metadata.columns]
+        complete_metadata[columns] = complete_metadata[columns].astype('string').astype('category')
         return complete_metadata
     else:
         return pd.DataFrame()
@@ -57,16 +60,16 @@ def get_images_by_language(language):
     filtered = df[df['language'] == language]
 
     images_data = []
-    for _, row in filtered.iterrows():
+    for filename, caption, source in filtered[['filename', 'caption', 'source']].itertuples(index=False, name=None):
         # Determine which folder to look in
-        folder = "uploaded_images" if row['source'] == 'uploaded' else "captioned_images"
-        image_path = os.path.join(folder, row['filename'])
+        folder = "uploaded_images" if source == 'uploaded' else "captioned_images"
+        image_path = os.path.join(folder, filename)
 
         if os.path.exists(image_path):
             images_data.append({
                 'path': image_path,
-                'caption': row['caption'],
-                'filename': row['filename']
+                'caption': caption,
+                'filename': filename
             })
 
     return images_data
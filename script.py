@@ -48,8 +48,6 @@ def initialize_directories():
 
 def save_image_and_metadata(uploaded_file, caption, language):
     """Save uploaded image and its metadata"""
-    initialize_directories()
-    
     # Generate unique filename
     file_extension = uploaded_file.name.split('.')[-1]
     unique_filename = f"{uuid.uuid4()}.{file_extension}"
@@ -84,8 +82,6 @@ def save_image_and_metadata(uploaded_file, caption, language):
 
 def get_random_image():
     """Get a random image from uploaded_images folder"""
-    initialize_directories()
-    
     if not os.path.exists("uploaded_images"):
         return None
     
@@ -98,8 +94,6 @@ def get_random_image():
 
 def save_captioned_image(filename, caption, language):
     """Save image with new caption to captioned_images folder"""
-    initialize_directories()
-    
     # Copy image to captioned folder
     src_path = os.path.join("uploaded_images", filename)
     dst_path = os.path.join("captioned_images", filename)
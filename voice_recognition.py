@@ -5,13 +5,52 @@ from io import BytesIO
 import wave
 import uuid
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
 import sounddevice as sd
-import soundfile as sf
+
+
+# Speech recognition locale for each supported caption language
+SPEECH_LANGUAGE_CODES = {
+    "English": "en-US",
+    "Hindi": "hi-IN",
+    "Bengali": "bn-IN",
+    "Telugu": "te-IN",
+    "Marathi": "mr-IN",
+    "Tamil": "ta-IN",
+    "Gujarati": "gu-IN",
+    "Urdu": "ur-IN",
+    "Kannada": "kn-IN",
+    "Odia": "or-IN",
+    "Malayalam": "ml-IN",
+    "Punjabi": "pa-IN",
+    "Assamese": "as-IN",
+    "Nepali": "ne-NP",
+    "Sanskrit": "sa-IN",
+}
+
+# Longest recording the UI offers; recording buffers are sized for this up front
+MAX_RECORDING_SECONDS = 30
+
+# Background pool for WAV writes so recognition doesn't wait on disk IO
+_io_pool = ThreadPoolExecutor(max_workers=2)
+
+
+def write_wav(filepath, recording, samplerate, channels):
+    """Write an int16 recording as 16-bit PCM WAV using the stdlib wave module"""
+    with wave.open(filepath, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(samplerate)
+        wav_file.writeframes(recording.tobytes())
 
 
 class SpeechRecognizer:
     def __init__(self):
         self.recognizer = sr.Recognizer()
+        # Future for the most recent background WAV write
+        self.pending_write = None
+        # Reusable int16 recording buffers keyed by (samplerate, channels)
+        self.recording_buffers = {}
         # Ensure voice input directory exists
         if not os.path.exists("voice_inputs"):
             os.makedirs("voice_inputs")
@@ -20,23 +59,38 @@ class SpeechRecognizer:
         """No-op when using sounddevice for recording (kept for API compatibility)"""
         return
 
+    def get_recording_buffer(self, frames: int, samplerate: int, channels: int):
+        """Return a reusable int16 buffer of shape (frames, channels) for sd.rec."""
+        import numpy as np
+
+        # The previous background write may still be reading the buffer
+        if self.pending_write is not None:
+            wait([self.pending_write])
+        key = (samplerate, channels)
+        buffer = self.recording_buffers.get(key)
+        if buffer is None or len(buffer) < frames:
+            buffer = np.empty((max(frames, MAX_RECORDING_SECONDS * samplerate), channels), dtype=np.int16)
+            self.recording_buffers[key] = buffer
+        return buffer[:frames]
+
     def record_with_sounddevice(self, duration_seconds: int = 10, samplerate: int = 16000, channels: int = 1):
-        """Record audio using sounddevice and save as 16-bit PCM WAV. Returns (filepath, duration)."""
+        """Record audio using sounddevice and save as 16-bit PCM WAV. Returns (filepath, duration, recording, samplerate)."""
         try:
             st.info(f"🎙️ Recording for {duration_seconds} seconds...")
-            recording = sd.rec(int(duration_seconds * samplerate), samplerate=samplerate, channels=channels, dtype='int16')
+            recording = self.get_recording_buffer(int(duration_seconds * samplerate), samplerate, channels)
+            sd.rec(out=recording, samplerate=samplerate)
             sd.wait()
 
             unique_id = uuid.uuid4()
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"voice_{timestamp}_{unique_id}.wav"
             filepath = os.path.join("voice_inputs", filename)
-            # Write WAV
-            sf.write(filepath, recording, samplerate, subtype='PCM_16')
-            return filepath, float(duration_seconds)
+            # Write WAV in the background; recognition only needs the in-memory recording
+            self.pending_write = _io_pool.submit(write_wav, filepath, recording, samplerate, channels)
+            return filepath, float(duration_seconds), recording, samplerate
         except Exception as e:
             st.error(f"Error recording audio: {str(e)}")
-            return None, None
+            return None, None, None, None
 
     def recognize_speech(self, audio, language='en-US'):
         """Convert audio to text using Google Speech Recognition (simple)"""
@@ -88,6 +142,10 @@ class SpeechRecognizer:
                 'raw': {'error': f'exception: {str(e)}'}
             }
 
+    def audio_data_from_recording(self, recording, samplerate: int):
+        """Wrap an in-memory int16 recording as sr.AudioData without re-reading the WAV."""
+        return sr.AudioData(recording.tobytes(), samplerate, recording.dtype.itemsize)
+
     def load_audio_for_recognition(self, wav_path: str):
         """Load a WAV file into sr.AudioData for recognition."""
         try:
@@ -100,24 +158,7 @@ class SpeechRecognizer:
 
     def get_language_code(self, language_name):
         """Convert language name to speech recognition language code"""
-        language_codes = {
-            "English": "en-US",
-            "Hindi": "hi-IN",
-            "Bengali": "bn-IN",
-            "Telugu": "te-IN",
-            "Marathi": "mr-IN",
-            "Tamil": "ta-IN",
-            "Gujarati": "gu-IN",
-            "Urdu": "ur-IN",
-            "Kannada": "kn-IN",
-            "Odia": "or-IN",
-            "Malayalam": "ml-IN",
-            "Punjabi": "pa-IN",
-            "Assamese": "as-IN",
-            "Nepali": "ne-NP",
-            "Sanskrit": "sa-IN",
-        }
-        return language_codes.get(language_name, "en-US")
+        return SPEECH_LANGUAGE_CODES.get(language_name, "en-US")
 
 
 def create_voice_input_component(language="English", key_suffix=""):
@@ -135,18 +176,18 @@ def create_voice_input_component(language="English", key_suffix=""):
     col1, col2 = st.columns([1, 1])
 
     with col1:
-        duration = st.slider("Recording duration (seconds)", min_value=3, max_value=30, value=10, key=f"duration_{key_suffix}")
+        duration = st.slider("Recording duration (seconds)", min_value=3, max_value=MAX_RECORDING_SECONDS, value=10, key=f"duration_{key_suffix}")
         if st.button("🎤 Record", key=f"record_{key_suffix}", type="primary"):
             with st.spinner("🎧 Recording and processing..."):
                 # Record to WAV using sounddevice
-                audio_path, audio_duration = recognizer.record_with_sounddevice(duration_seconds=duration)
+                audio_path, audio_duration, recording, samplerate = recognizer.record_with_sounddevice(duration_seconds=duration)
                 if audio_path:
                     st.session_state[f'voice_audio_path_{key_suffix}'] = audio_path
                     st.session_state[f'voice_audio_duration_{key_suffix}'] = audio_duration
                     # Get language code
                     lang_code = recognizer.get_language_code(language)
-                    # Load for recognition
-                    audio_data = recognizer.load_audio_for_recognition(audio_path)
+                    # Recognize from the in-memory recording
+                    audio_data = recognizer.audio_data_from_recording(recording, samplerate)
                     if audio_data is not None:
                         result = recognizer.recognize_with_details(audio_data, language=lang_code)
                         transcript = result.get('transcript', '')
@@ -163,6 +204,12 @@ def create_voice_input_component(language="English", key_suffix=""):
                             st.error("❌ Could not understand audio or recognition failed")
                         else:
                             st.success("✅ Speech recognized successfully!")
+
+                    # The WAV is written in the background; don't keep a path to a file that failed to save
+                    write_error = recognizer.pending_write.exception()
+                    if write_error is not None:
+                        st.session_state[f'voice_audio_path_{key_suffix}'] = None
+                        st.warning(f"⚠️ Could not save the audio recording: {str(write_error)}")
                 else:
                     st.warning("⚠️ Recording failed. Please try again.")
 
@@ -201,7 +248,6 @@ def install_speech_dependencies():
     """Check presence of required dependencies for voice capture and recognition"""
     try:
         import sounddevice  # noqa: F401
-        import soundfile  # noqa: F401
         import speech_recognition  # noqa: F401
         return True
     except ImportError: